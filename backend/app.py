@@ -8,28 +8,78 @@ for refreshing datacenter inventory data.
 IMPORTANT: Only performs READ operations via CLI tools.
 """
 
-from flask import Flask, jsonify, send_from_directory, session, request
+from flask import Flask, Response, g, jsonify, send_from_directory, session, request
 from flask_cors import CORS
 import subprocess
 import json
 import os
 import base64
 from pathlib import Path
+import functools
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from email.utils import formatdate
 import secrets
 
-app = Flask(__name__, static_folder='../frontend', static_url_path='')
-app.secret_key = secrets.token_hex(32)  # Generate random secret key for sessions
-CORS(app, supports_credentials=True)
+from scripts import process_admin_inventory, update_metrics
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to stdlib
+    orjson = None
+    _json_loads = json.loads
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
 
 # Configuration
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
 
-# Track refresh status
+def _load_secret_key():
+    """Load (or create and persist) the session secret key.
+
+    Regenerating the key on every start invalidated all client sessions on
+    each restart, forcing a re-login storm. Persist the key to a file; set
+    CRUSOE_SECRET_KEY to share one key across multiple workers.
+    """
+    env_key = os.environ.get('CRUSOE_SECRET_KEY')
+    if env_key:
+        return env_key
+
+    key_path = BASE_DIR / ".session_key"
+    if key_path.exists():
+        return key_path.read_bytes()
+
+    key = secrets.token_bytes(32)
+    # Create the file 0o600 from the start so the key is never exposed
+    # through default-umask permissions, even briefly
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.secret_key = _load_secret_key()
+# Let browsers cache static assets instead of re-requesting on every
+# navigation; HTML entrypoints opt out below so deploys show up immediately
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
+# Scope CORS to the API routes and let browsers cache preflight results for
+# an hour instead of re-issuing OPTIONS before every call. The frontend
+# sends the session cookie (credentials: 'include') to all three route
+# groups, so credentials stay enabled on each.
+CORS(app, resources={
+    r"/api/auth/*": {"supports_credentials": True},
+    r"/api/data/*": {"supports_credentials": True},
+    r"/api/refresh*": {"supports_credentials": True},
+}, max_age=3600)
+
+# Track refresh status. Mutated by the background refresh thread and read by
+# status polls/streams, so all access goes through refresh_status_lock.
 refresh_status = {
     "in_progress": False,
     "progress": 0,
@@ -37,64 +87,150 @@ refresh_status = {
     "error": None,
     "last_updated": None
 }
+refresh_status_lock = threading.Lock()
+refresh_event = threading.Event()
+
+# Encoded status snapshot, refreshed on each mutation so the (frequently
+# polled) status endpoint never re-serializes an unchanged dict
+_status_bytes = _json_dumps(refresh_status)
+
+# Single-worker pool for background refreshes: bounds concurrency to one
+# refresh at a time and reuses the worker thread across triggers
+_refresh_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='refresh')
+_refresh_future = None
+
+def _update_status(**changes):
+    """Apply refresh status changes atomically and wake stream listeners."""
+    global _status_bytes
+    with refresh_status_lock:
+        refresh_status.update(changes)
+        _status_bytes = _json_dumps(refresh_status)
+    refresh_event.set()
+
+# Cache of data-file bytes keyed by (mtime_ns, size). Between refresh runs
+# the data files are immutable, so steady-state reads never touch the disk.
+_json_cache = {}
+
+def _serve_json_file(path, missing_error):
+    """Serve a JSON data file from the mtime-keyed byte cache."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return jsonify({"error": missing_error}), 404
+
+    # Answer conditional requests with an empty 304 so steady-state polls
+    # of unchanged data cost neither bandwidth nor encoding
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _json_cache.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, path.read_bytes())
+        _json_cache[path] = cached
+
+    response = Response(cached[1], mimetype='application/json')
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = formatdate(stat.st_mtime, usegmt=True)
+    return response
+
+@functools.lru_cache(maxsize=1)
+def _get_user_email():
+    """Look up the user's email from git config (cached for process lifetime)."""
+    try:
+        result = subprocess.run(
+            ['git', 'config', 'user.email'],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return os.getenv('USER', 'unknown')
 
 # Session management helpers
 def get_token_file():
     """Get the path to the admin token file."""
     return Path.home() / ".crusoe" / "admin-token-prod"
 
-def validate_token():
-    """Check if a valid token exists."""
-    token_file = get_token_file()
-    if not token_file.exists():
-        return False, "Token file not found"
+def _decode_jwt_payload(token):
+    """Decode a JWT's payload segment (without signature verification)."""
+    parts = token.split('.', 2)
+    if len(parts) < 2:
+        raise ValueError("Invalid token format")
 
-    try:
-        with open(token_file, 'r') as f:
-            token = f.read().strip()
+    payload = parts[1]
+    payload += '=' * (-len(payload) % 4)  # restore stripped base64 padding
+    return _json_loads(base64.urlsafe_b64decode(payload))
+
+# Decoded JWT payload cached against the token file's mtime; a re-issued
+# token changes the mtime and invalidates the entry
+_token_cache = None
+
+def _load_token_data():
+    """Read and decode the admin token payload, cached on the file's mtime."""
+    global _token_cache
+
+    token_file = get_token_file()
+    stat = token_file.stat()
 
-        # Decode JWT payload to verify it's valid
-        parts = token.split('.')
-        if len(parts) < 2:
-            return False, "Invalid token format"
+    if _token_cache is not None and _token_cache[0] == stat.st_mtime_ns:
+        return _token_cache[1]
 
-        payload = parts[1]
-        padding = 4 - len(payload) % 4
-        if padding != 4:
-            payload += '=' * padding
+    with open(token_file, 'r') as f:
+        token = f.read().strip()
 
-        decoded = base64.urlsafe_b64decode(payload)
-        token_data = json.loads(decoded)
+    token_data = _decode_jwt_payload(token)
 
-        # Check if token has expired (if exp field exists)
-        if 'exp' in token_data:
-            exp_time = datetime.fromtimestamp(token_data['exp'])
-            if datetime.now() > exp_time:
-                return False, "Token has expired"
+    _token_cache = (stat.st_mtime_ns, token_data)
+    return token_data
 
-        return True, token_data
+def validate_token():
+    """Check if a valid token exists."""
+    try:
+        token_data = _load_token_data()
+    except FileNotFoundError:
+        return False, "Token file not found"
+    except ValueError as e:
+        return False, str(e)
     except Exception as e:
         return False, f"Token validation failed: {str(e)}"
 
+    # Check if token has expired (if exp field exists)
+    if 'exp' in token_data:
+        exp_time = datetime.fromtimestamp(token_data['exp'])
+        if datetime.now() > exp_time:
+            return False, "Token has expired"
+
+    return True, token_data
+
 def require_session(f):
     """Decorator to require valid session for endpoints."""
-    from functools import wraps
-    @wraps(f)
+    @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        if not session.get('authenticated'):
+        # Cache the verification result on flask.g so stacked checks within
+        # a single request only deserialize the session cookie once
+        authenticated = getattr(g, '_auth_checked', None)
+        if authenticated is None:
+            authenticated = session.get('authenticated', False)
+            g._auth_checked = authenticated
+        if not authenticated:
             return jsonify({"error": "Not authenticated"}), 401
         return f(*args, **kwargs)
     return decorated_function
 
 def run_refresh_task():
     """Background task to refresh datacenter inventory."""
-    global refresh_status
-
     try:
-        refresh_status["in_progress"] = True
-        refresh_status["progress"] = 10
-        refresh_status["message"] = "Fetching node inventory from cloud-admin..."
-        refresh_status["error"] = None
+        _update_status(
+            in_progress=True,
+            progress=10,
+            message="Fetching node inventory from cloud-admin...",
+            error=None
+        )
 
         # Step 1: Fetch raw inventory from cloud-admin
         admin_inventory_file = DATA_DIR / "admin_nodes_inventory.json"
@@ -103,61 +239,59 @@ def run_refresh_task():
             "nodes", "list", "--format", "json"
         ]
 
-        # Pass environment variables needed by cloud-admin (HOME, PATH, etc.)
-        env = os.environ.copy()
-
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, env=env)
+        # Point the child's stdout at the file descriptor so the inventory
+        # dump never gets materialized in this process; only stderr is
+        # captured for the error branch. The child inherits our environment
+        # (HOME, PATH, etc. needed by cloud-admin) by default.
+        with open(admin_inventory_file, 'wb') as f:
+            subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, check=True)
 
-        with open(admin_inventory_file, 'w') as f:
-            f.write(result.stdout)
+        # Steps 2 and 3 run in-process: importing the scripts instead of
+        # spawning python3 saves two interpreter cold starts per refresh.
+        # Parse the inventory we just wrote once and hand it to the processor
+        # so it doesn't re-read the file from disk. (update_metrics pulls
+        # from the Crusoe CLI, so it has no use for this data.)
+        _update_status(progress=50, message="Processing datacenter hierarchy...")
+        nodes = _json_loads(admin_inventory_file.read_bytes())
+        process_admin_inventory.main(nodes)
 
-        refresh_status["progress"] = 50
-        refresh_status["message"] = "Processing datacenter hierarchy..."
-        time.sleep(0.5)  # Small delay to show progress
+        _update_status(progress=80, message="Updating customer metrics...")
+        update_metrics.main()
 
-        # Step 2: Process inventory into hierarchy
-        process_script = BASE_DIR / "scripts" / "process_admin_inventory.py"
-        subprocess.run(["python3", str(process_script)], check=True)
+        _update_status(progress=100, message="Refresh complete!",
+                       last_updated=time.time())
 
-        refresh_status["progress"] = 80
-        refresh_status["message"] = "Updating customer metrics..."
-        time.sleep(0.5)
-
-        # Step 3: Update customer metrics
-        metrics_script = BASE_DIR / "scripts" / "update_metrics.py"
-        subprocess.run(["python3", str(metrics_script)], check=True)
-
-        refresh_status["progress"] = 100
-        refresh_status["message"] = "Refresh complete!"
-        refresh_status["last_updated"] = time.time()
+        # Drop cached data-file bytes so the next read picks up fresh files
+        _json_cache.clear()
 
     except subprocess.CalledProcessError as e:
-        refresh_status["error"] = f"Command failed: {e.stderr if e.stderr else str(e)}"
-        refresh_status["message"] = "Refresh failed"
+        stderr = e.stderr.decode(errors='replace') if e.stderr else None
+        _update_status(
+            error=f"Command failed: {stderr if stderr else str(e)}",
+            message="Refresh failed"
+        )
     except Exception as e:
-        refresh_status["error"] = str(e)
-        refresh_status["message"] = "Refresh failed"
+        _update_status(error=str(e), message="Refresh failed")
     finally:
-        time.sleep(1)  # Keep status visible for a moment
-        refresh_status["in_progress"] = False
+        _update_status(in_progress=False)
 
 
 @app.route('/')
 def index():
     """Serve the capacity dashboard."""
-    return send_from_directory(str(FRONTEND_DIR), 'capacity.html')
+    return send_from_directory(str(FRONTEND_DIR), 'capacity.html', max_age=0)
 
 
 @app.route('/index.html')
 def customer_dashboard():
     """Serve the customer-facing dashboard."""
-    return send_from_directory(str(FRONTEND_DIR), 'index.html')
+    return send_from_directory(str(FRONTEND_DIR), 'index.html', max_age=0)
 
 
 @app.route('/<path:path>')
 def serve_static(path):
     """Serve static files."""
-    return send_from_directory(str(FRONTEND_DIR), path)
+    return send_from_directory(str(FRONTEND_DIR), path, max_age=3600)
 
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -176,21 +310,9 @@ def login():
     session['user_data'] = result
     session.permanent = True
 
-    # Get user email
-    try:
-        email_result = subprocess.run(
-            ['git', 'config', 'user.email'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        user_email = email_result.stdout.strip() if email_result.returncode == 0 else os.getenv('USER', 'unknown')
-    except Exception:
-        user_email = os.getenv('USER', 'unknown')
-
     return jsonify({
         "success": True,
-        "user_email": user_email
+        "user_email": _get_user_email()
     })
 
 
@@ -206,20 +328,9 @@ def auth_status():
     """Check if user is authenticated."""
     authenticated = session.get('authenticated', False)
     if authenticated:
-        try:
-            email_result = subprocess.run(
-                ['git', 'config', 'user.email'],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            user_email = email_result.stdout.strip() if email_result.returncode == 0 else os.getenv('USER', 'unknown')
-        except Exception:
-            user_email = os.getenv('USER', 'unknown')
-
         return jsonify({
             "authenticated": True,
-            "user_email": user_email
+            "user_email": _get_user_email()
         })
     else:
         return jsonify({"authenticated": False})
@@ -229,18 +340,17 @@ def auth_status():
 @require_session
 def trigger_refresh():
     """Trigger a data refresh."""
-    global refresh_status
+    global _refresh_future
 
-    if refresh_status["in_progress"]:
+    # The future, not the status dict, is the source of truth for whether
+    # a refresh is still running
+    if _refresh_future is not None and not _refresh_future.done():
         return jsonify({
             "status": "in_progress",
             "message": "Refresh already in progress"
         }), 409
 
-    # Start refresh in background thread
-    thread = threading.Thread(target=run_refresh_task)
-    thread.daemon = True
-    thread.start()
+    _refresh_future = _refresh_pool.submit(run_refresh_task)
 
     return jsonify({
         "status": "started",
@@ -251,33 +361,47 @@ def trigger_refresh():
 @app.route('/api/refresh/status', methods=['GET'])
 def get_refresh_status():
     """Get current refresh status."""
-    return jsonify(refresh_status)
+    return Response(_status_bytes, mimetype='application/json')
+
+
+@app.route('/api/refresh/stream', methods=['GET'])
+@require_session
+def stream_refresh_status():
+    """Stream refresh status updates as server-sent events.
+
+    Lets clients subscribe to status transitions instead of busy-polling
+    /api/refresh/status. Each open stream pins one synchronous waitress
+    worker, so the generator is bounded: it emits the current snapshot,
+    follows the run until in_progress goes false, then closes. Idle
+    clients get one event and rely on EventSource auto-reconnect to pick
+    up the next run.
+    """
+    def generate():
+        while True:
+            yield b"data: " + _status_bytes + b"\n\n"
+            with refresh_status_lock:
+                if not refresh_status["in_progress"]:
+                    return
+            refresh_event.wait(timeout=15)
+            refresh_event.clear()
+
+    return Response(generate(), mimetype='text/event-stream')
 
 
 @app.route('/api/data/inventory', methods=['GET'])
 @require_session
 def get_inventory():
     """Get datacenter inventory."""
-    inventory_file = DATA_DIR / "datacenter_inventory.json"
-    try:
-        with open(inventory_file, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
-    except FileNotFoundError:
-        return jsonify({"error": "Inventory data not found"}), 404
+    return _serve_json_file(DATA_DIR / "datacenter_inventory.json",
+                            "Inventory data not found")
 
 
 @app.route('/api/data/metrics', methods=['GET'])
 @require_session
 def get_metrics():
     """Get customer metrics."""
-    metrics_file = DATA_DIR / "metrics.json"
-    try:
-        with open(metrics_file, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
-    except FileNotFoundError:
-        return jsonify({"error": "Metrics data not found"}), 404
+    return _serve_json_file(DATA_DIR / "metrics.json",
+                            "Metrics data not found")
 
 
 @app.route('/api/auth/info', methods=['GET'])
@@ -285,88 +409,60 @@ def get_metrics():
 def get_auth_info():
     """Get authentication information (user and token details)."""
     try:
-        # Read JWT token
-        token_file = Path.home() / ".crusoe" / "admin-token-prod"
-        with open(token_file, 'r') as f:
-            token = f.read().strip()
-
-        # Decode JWT payload (without signature verification)
-        parts = token.split('.')
-        if len(parts) >= 2:
-            payload = parts[1]
-            # Add padding if needed
-            padding = 4 - len(payload) % 4
-            if padding != 4:
-                payload += '=' * padding
-
-            decoded = base64.urlsafe_b64decode(payload)
-            token_data = json.loads(decoded)
-
-            # Get user email from git config
-            try:
-                result = subprocess.run(
-                    ['git', 'config', 'user.email'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                user_email = result.stdout.strip() if result.returncode == 0 else os.getenv('USER', 'unknown')
-            except Exception:
-                user_email = os.getenv('USER', 'unknown')
-
-            # Extract token info
-            issued_at = token_data.get('iat', 0)
-            issued_datetime = datetime.fromtimestamp(issued_at) if issued_at > 0 else None
-
-            # Check for token expiration
-            expires_at = token_data.get('exp')
-            expires_datetime = None
-            expires_display = "No expiration"
-            expires_in_seconds = None
-
-            if expires_at:
-                expires_datetime = datetime.fromtimestamp(expires_at)
-                expires_in_seconds = (expires_datetime - datetime.now()).total_seconds()
-
-                if expires_in_seconds < 0:
-                    expires_display = "Expired"
-                elif expires_in_seconds < 3600:  # Less than 1 hour
-                    minutes = int(expires_in_seconds / 60)
-                    expires_display = f"{minutes} min"
-                elif expires_in_seconds < 86400:  # Less than 1 day
-                    hours = int(expires_in_seconds / 3600)
-                    expires_display = f"{hours} hour{'s' if hours != 1 else ''}"
-                else:
-                    days = int(expires_in_seconds / 86400)
-                    expires_display = f"{days} day{'s' if days != 1 else ''}"
-
-            # Calculate token age (when it was issued)
-            age_display = "unknown"
-            age_seconds = None
-            if issued_datetime:
-                age_seconds = (datetime.now() - issued_datetime).total_seconds()
-                age_hours = int(age_seconds / 3600)
-                age_days = int(age_hours / 24)
-
-                if age_days > 0:
-                    age_display = f"{age_days} day{'s' if age_days != 1 else ''} ago"
-                elif age_hours > 0:
-                    age_display = f"{age_hours} hour{'s' if age_hours != 1 else ''} ago"
-                else:
-                    age_display = "< 1 hour ago"
-
-            return jsonify({
-                "user_email": user_email,
-                "token_issued_at": issued_datetime.isoformat() if issued_datetime else None,
-                "token_age": age_display,
-                "token_age_seconds": int(age_seconds) if age_seconds else None,
-                "token_expires_at": expires_datetime.isoformat() if expires_datetime else None,
-                "token_expires_in": expires_display,
-                "token_expires_in_seconds": int(expires_in_seconds) if expires_in_seconds else None,
-                "okta_subject": token_data.get('sub', 'unknown')
-            })
-        else:
-            return jsonify({"error": "Invalid token format"}), 500
+        # Decode JWT payload (without signature verification); served from the
+        # mtime cache on warm requests
+        token_data = _load_token_data()
+
+        user_email = _get_user_email()
+
+        # Extract token info; plain integer math on epoch seconds, datetime
+        # objects are only built for the ISO-formatted output fields
+        issued_at = token_data.get('iat', 0)
+        expires_at = token_data.get('exp')
+        now = time.time()
+
+        # Check for token expiration
+        expires_display = "No expiration"
+        expires_in_seconds = int(expires_at - now) if expires_at else None
+
+        if expires_in_seconds is not None:
+            if expires_in_seconds < 0:
+                expires_display = "Expired"
+            elif expires_in_seconds < 3600:  # Less than 1 hour
+                minutes = expires_in_seconds // 60
+                expires_display = f"{minutes} min"
+            elif expires_in_seconds < 86400:  # Less than 1 day
+                hours = expires_in_seconds // 3600
+                expires_display = f"{hours} hour{'s' if hours != 1 else ''}"
+            else:
+                days = expires_in_seconds // 86400
+                expires_display = f"{days} day{'s' if days != 1 else ''}"
+
+        # Calculate token age (when it was issued)
+        age_display = "unknown"
+        age_seconds = int(now - issued_at) if issued_at > 0 else None
+
+        if age_seconds is not None:
+            age_hours = age_seconds // 3600
+            age_days = age_hours // 24
+
+            if age_days > 0:
+                age_display = f"{age_days} day{'s' if age_days != 1 else ''} ago"
+            elif age_hours > 0:
+                age_display = f"{age_hours} hour{'s' if age_hours != 1 else ''} ago"
+            else:
+                age_display = "< 1 hour ago"
+
+        return jsonify({
+            "user_email": user_email,
+            "token_issued_at": datetime.fromtimestamp(issued_at).isoformat() if issued_at > 0 else None,
+            "token_age": age_display,
+            "token_age_seconds": age_seconds if age_seconds else None,
+            "token_expires_at": datetime.fromtimestamp(expires_at).isoformat() if expires_at else None,
+            "token_expires_in": expires_display,
+            "token_expires_in_seconds": expires_in_seconds if expires_in_seconds else None,
+            "okta_subject": token_data.get('sub', 'unknown')
+        })
 
     except FileNotFoundError:
         return jsonify({"error": "Token file not found"}), 404
@@ -393,4 +489,11 @@ if __name__ == '__main__':
     print("  - GET /api/auth/info - Get authentication info")
     print("\n" + "=" * 60 + "\n")
 
-    app.run(debug=True, host='0.0.0.0', port=port)
+    if os.environ.get('CRUSOE_DEV'):
+        # Development: Werkzeug dev server with reloader/debugger
+        app.run(debug=True, host='0.0.0.0', port=port)
+    else:
+        # Production: threaded WSGI server so status polls don't queue behind
+        # other requests while a refresh is running
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=8)
@@ -8,8 +8,13 @@ Provides hierarchical drill-down: Region → Floor → IB Fabric → Rack → GP
 IMPORTANT: Only performs READ operations via admin API.
 """
 
+import asyncio
+import functools
 import json
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
@@ -20,8 +25,18 @@ ADMIN_TOKEN_FILE = Path.home() / ".crusoe" / "admin-token-prod"
 DATA_DIR = Path(__file__).parent.parent / "data"
 INVENTORY_FILE = DATA_DIR / "datacenter_inventory.json"
 
+# Shared session so sequential requests reuse TCP/TLS connections instead of
+# paying a full handshake per probe
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+))
+
+@functools.lru_cache(maxsize=1)
 def get_admin_token():
-    """Read admin token from file"""
+    """Read admin token from file (cached for the process lifetime)"""
     try:
         with open(ADMIN_TOKEN_FILE, 'r') as f:
             return f.read().strip()
@@ -44,17 +59,18 @@ def make_admin_request(endpoint, method="GET"):
     token = get_admin_token()
     if not token:
         return None
-        
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
+
+    if "Authorization" not in SESSION.headers:
+        SESSION.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        })
+
     url = f"{ADMIN_API_BASE}{endpoint}"
-    
+
     try:
         print(f"→ GET {endpoint}")
-        response = requests.get(url, headers=headers, timeout=30)
+        response = SESSION.get(url, timeout=30)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
@@ -69,15 +85,48 @@ def make_admin_request(endpoint, method="GET"):
         print(f"  ❌ Error: {e}")
         return None
 
+async def _probe(session, semaphore, endpoint):
+    """Probe a single endpoint (READ-only); returns (endpoint, result)"""
+    async with semaphore:
+        try:
+            print(f"→ GET {endpoint}")
+            async with session.get(f"{ADMIN_API_BASE}{endpoint}") as response:
+                response.raise_for_status()
+                return endpoint, await response.json()
+        except asyncio.TimeoutError:
+            print(f"  ⏱ Timeout fetching {endpoint}")
+        except aiohttp.ClientResponseError as e:
+            print(f"  ❌ HTTP Error {e.status}: {endpoint}")
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+        return endpoint, None
+
+async def _discover(endpoints, token):
+    """Probe all candidate endpoints concurrently over one connection pool"""
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+    # Cap in-flight probes so we don't trip server-side rate limits
+    semaphore = asyncio.Semaphore(8)
+    connector = aiohttp.TCPConnector(limit=32)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(
+        headers=headers, connector=connector, timeout=timeout
+    ) as session:
+        return await asyncio.gather(
+            *(_probe(session, semaphore, e) for e in endpoints)
+        )
+
 def discover_api_endpoints():
     """
     Discover available admin API endpoints (READ-only)
-    Try common datacenter inventory endpoints
+    Try common datacenter inventory endpoints, probed concurrently
     """
     print("\n" + "="*60)
     print("DISCOVERING ADMIN API ENDPOINTS (READ-ONLY)")
     print("="*60 + "\n")
-    
+
     # Try common endpoint patterns
     potential_endpoints = [
         "/api/v1/datacenters",
@@ -92,11 +141,18 @@ def discover_api_endpoints():
         "/datacenters",
         "/inventory",
     ]
-    
+
+    token = get_admin_token()
+    if not token:
+        return []
+
+    # Fire all probes concurrently: wall time is the slowest single probe
+    # rather than the sum of all round-trips
+    results = asyncio.run(_discover(potential_endpoints, token))
+
     working_endpoints = []
-    
-    for endpoint in potential_endpoints:
-        result = make_admin_request(endpoint)
+
+    for endpoint, result in results:
         if result is not None:
             working_endpoints.append(endpoint)
             print(f"  ✓ Found: {endpoint}")
@@ -106,7 +162,7 @@ def discover_api_endpoints():
             elif isinstance(result, list):
                 print(f"    Count: {len(result)} items")
             print()
-    
+
     if not working_endpoints:
         print("❌ No working endpoints found!")
         print("\nPlease provide the correct admin API endpoint for datacenter inventory.")
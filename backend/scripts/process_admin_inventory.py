@@ -8,11 +8,30 @@ Region → Floor → IB Fabric → Rack → Node → GPU
 IMPORTANT: This script only performs READ operations and data processing.
 """
 
+import functools
 import json
 import re
+import sys
+from array import array
 from pathlib import Path
-from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Output is compact (no indentation): the file is consumed by machines
+# (frontend fetch, query_capacity), and the repeated per-rack stat keys make
+# pretty-printing disproportionately expensive to write, store, and re-parse
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to stdlib
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; without it the file is read whole
+    ijson = None
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -44,6 +63,160 @@ LOCATION_NAMES = {
     "vaeq-cu": {"name": "Virginia", "region": "us-east1-a"},
 }
 
+# Node-name patterns, compiled once at import so the per-node hot path skips
+# the re-cache lookup entirely. They match the name minus its trailing
+# node number, so every node in a rack shares one cached parse.
+# 5-part: {location1}-{location2}-{floor}-{rack}-prod-hv
+_NODE_RE_5 = re.compile(r'^([a-z0-9]+)-([a-z0-9]+)-([a-z0-9]+)-(r\d+)-prod-hv$')
+# 4-part: {location}-{floor}-{rack}-prod-hv
+_NODE_RE_4 = re.compile(r'^([a-z0-9]+)-([a-z0-9]+)-(r\d+)-prod-hv$')
+# GPU count suffix, e.g. _4_IB
+_GPU_COUNT_RE = re.compile(r'_(\d+)_IB')
+
+# Single alternation over every known slice-type GPU marker; one scan of the
+# string replaces the chain of substring checks
+_SLICE_RE = re.compile(
+    r'(H200_SXM_141GB|H100_SXM_80GB|GB200_(?:NVL_)?186GB|B200_(?:SXM_)?180GB|'
+    r'L40S_(?:PCIE_)?48GB|A100_SXM_80GB|A100_PCIE_80GB|A100_PCIE_40GB|'
+    r'MI300X_192GB|MI355X_288GB)'
+)
+
+# Any GPU family marker at all; used to tell CPU-only slices from GPU slices
+# whose exact model the alternation above doesn't know
+_GPU_PRESENT_RE = re.compile(
+    r'H100|H200|GB200|B200|L40S|A100|A40|A6000|MI300X|MI355X', re.IGNORECASE
+)
+
+# Matched spellings that differ from their canonical GPU_TYPE_MAP key
+_SLICE_CANON = {
+    'H200_SXM_141GB': 'H200_141GB',
+    'GB200_NVL_186GB': 'GB200_186GB',
+    'B200_SXM_180GB': 'B200_180GB',
+    'L40S_PCIE_48GB': 'L40S_48GB',
+    'A100_SXM_80GB': 'A100_80GB_SXM',
+    'A100_PCIE_80GB': 'A100_80GB_PCIE',
+    'A100_PCIE_40GB': 'A100_40GB_PCIE',
+}
+
+# The eight per-level counters shared by location, floor, and rack entries.
+# During processing they live in a packed array('q') indexed by the offsets
+# below (integer indexing instead of a dict hash per increment); the arrays
+# are expanded back into named fields just before serialization
+_STAT_FIELDS = (
+    "total_nodes", "total_gpus",
+    "available_nodes", "available_gpus",
+    "spare_nodes", "spare_gpus",
+    "hot_spare_nodes", "hot_spare_gpus",
+)
+_TN, _TG, _AN, _AG, _SN, _SG, _HN, _HG = range(8)
+
+def _new_stats():
+    """Create a zeroed packed counter block."""
+    return array('q', (0,) * 8)
+
+def _new_location(location):
+    """Create an empty location entry."""
+    names = LOCATION_NAMES.get(location, {})
+    return {
+        "name": names.get("name", location),
+        "region": names.get("region", location),
+        "stats": _new_stats(),
+        "floors": {},
+    }
+
+def _new_floor(floor):
+    """Create an empty floor entry."""
+    return {"name": floor, "stats": _new_stats(), "racks": {}}
+
+def _new_rack(rack):
+    """Create an empty rack entry."""
+    return {"name": rack, "stats": _new_stats(), "ib_fabrics": {}}
+
+def _new_ib_fabric(ib_network_id):
+    """Create an empty IB fabric entry."""
+    return {"id": ib_network_id, "nodes": []}
+
+def _intern(value):
+    """Intern categorical string values so duplicates share one object.
+
+    A fleet has thousands of nodes but only a handful of distinct GPU types,
+    vendors, states, modes, and locations; interning collapses the copies.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+def _bump(stat_blocks, gpus, is_available, is_spare, is_hot_spare):
+    """Apply one node's counters to every aggregation level in a single pass."""
+    for stats in stat_blocks:
+        stats[_TN] += 1
+        stats[_TG] += gpus
+        if is_available:
+            stats[_AN] += 1
+            stats[_AG] += gpus
+        if is_spare:
+            stats[_SN] += 1
+            stats[_SG] += gpus
+        if is_hot_spare:
+            stats[_HN] += 1
+            stats[_HG] += gpus
+
+def _bump_gpu_totals(bucket, gpus, is_available, is_spare, is_hot_spare):
+    """Apply one node's GPU count to a gpu_models/vendors bucket."""
+    bucket["total"] += gpus
+    if is_available:
+        bucket["available"] += gpus
+    if is_spare:
+        bucket["spare"] += gpus
+    if is_hot_spare:
+        bucket["hot_spare"] += gpus
+
+def _is_name_segment(segment):
+    """True when segment matches the [a-z0-9]+ charset of the name patterns."""
+    return segment.isascii() and segment.isalnum() and segment == segment.lower()
+
+def _is_rack_segment(segment):
+    """True when segment is an ASCII r<digits> rack identifier."""
+    return (segment.startswith('r') and len(segment) > 1
+            and segment.isascii() and segment[1:].isdigit())
+
+@functools.lru_cache(maxsize=2048)
+def _parse_prefix(prefix):
+    """Parse a node-name prefix (the name minus its trailing number).
+
+    Only the node number differs between nodes in a rack, so caching by
+    prefix means each rack's name is regex-matched once per run.
+
+    Returns:
+        tuple: (location, floor, rack), or None if the prefix is non-standard
+    """
+    # Fast path: the format is fixed-delimiter, so a structural split with
+    # full per-segment validation covers well-formed names without the regex
+    # engine. Every check mirrors the compiled patterns exactly — location
+    # and floor segments must be [a-z0-9]+ and the rack an ASCII r<digits> —
+    # so the fast path accepts nothing the regexes would reject
+    parts = prefix.split('-')
+    if parts[-2:] == ['prod', 'hv']:
+        # 5-part pattern: location1-location2-floor-rack-prod-hv
+        if (len(parts) == 6 and _is_rack_segment(parts[3])
+                and all(map(_is_name_segment, parts[:3]))):
+            return (f"{parts[0]}-{parts[1]}", parts[2], parts[3])
+        # 4-part pattern: location-floor-rack-prod-hv
+        if (len(parts) == 5 and _is_rack_segment(parts[2])
+                and all(map(_is_name_segment, parts[:2]))):
+            return (parts[0], parts[1], parts[2])
+
+    # Fall back to the compiled patterns for anything the split rejected
+    match = _NODE_RE_5.match(prefix)
+
+    if match:
+        return (f"{match.group(1)}-{match.group(2)}", match.group(3), match.group(4))
+
+    match2 = _NODE_RE_4.match(prefix)
+
+    if match2:
+        return (match2.group(1), match2.group(2), match2.group(3))
+
+    return None
+
 def parse_node_name(node_name):
     """
     Parse node name to extract location, floor, rack, and node number.
@@ -59,30 +232,16 @@ def parse_node_name(node_name):
     # Pattern: {location_code}-{floor_code}-{rack}-prod-hv-{number}
     # Location codes are like: icat-m, vaeq-cu, txdr-iah, nvrm-bsl
     # Floor codes are like: m03a, cu12a, iah02a, bsl01a
-    # Extract floor identifier (letter+number+letter pattern like m03a, cu12a)
-
-    pattern = r'^([a-z0-9]+)-([a-z0-9]+)-([a-z0-9]+)-(r\d+)-prod-hv-(\d+)$'
-    match = re.match(pattern, node_name)
+    prefix, _, number = node_name.rpartition('-')
+    parsed = _parse_prefix(prefix) if number.isdigit() else None
 
-    if match:
-        # For 5-part pattern: location1-location2-floor-rack-prod-hv-num
-        return {
-            "location": f"{match.group(1)}-{match.group(2)}",
-            "floor": match.group(3),
-            "rack": match.group(4),
-            "node_number": match.group(5)
-        }
-
-    # Try 4-part pattern: location-floor-rack-prod-hv-num
-    pattern2 = r'^([a-z0-9]+)-([a-z0-9]+)-(r\d+)-prod-hv-(\d+)$'
-    match2 = re.match(pattern2, node_name)
-
-    if match2:
+    if parsed is not None:
+        location, floor, rack = parsed
         return {
-            "location": match2.group(1),
-            "floor": match2.group(2),
-            "rack": match2.group(3),
-            "node_number": match2.group(4)
+            "location": location,
+            "floor": floor,
+            "rack": rack,
+            "node_number": number
         }
 
     # Fallback for non-standard names
@@ -94,48 +253,32 @@ def parse_node_name(node_name):
         "node_number": "unknown"
     }
 
+@functools.lru_cache(maxsize=64)
 def parse_gpu_type(slice_type):
     """
-    Extract GPU type from slice type string.
+    Extract GPU type from slice type string (cached per unique slice type).
 
     Example: SLICE_TYPE_VCPU_88_MEM_480_H100_SXM_80GB_4_IB
     Returns: H100_SXM_80GB
     """
-    # Check if this is a CPU-only instance (no GPU in name)
-    if not any(gpu in slice_type.upper() for gpu in ['H100', 'H200', 'GB200', 'B200', 'L40S', 'A100', 'A40', 'A6000', 'MI300X', 'MI355X']):
-        return "CPU_ONLY"
-
-    # Extract GPU model from slice type using flexible regex patterns
+    # Extract GPU model from slice type with a single pass of the alternation
     # Format: SLICE_TYPE_VCPU_X_MEM_Y_<GPU_MODEL>_<SIZE>_<COUNT>_[IB]
+    match = _SLICE_RE.search(slice_type)
+    if match:
+        marker = match.group(1)
+        return _SLICE_CANON.get(marker, marker)
 
-    # Try specific patterns
-    if 'H200_SXM_141GB' in slice_type:
-        return 'H200_141GB'
-    elif 'H100_SXM_80GB' in slice_type:
-        return 'H100_SXM_80GB'
-    elif 'GB200_NVL_186GB' in slice_type or 'GB200_186GB' in slice_type:
-        return 'GB200_186GB'
-    elif 'B200_SXM_180GB' in slice_type or 'B200_180GB' in slice_type:
-        return 'B200_180GB'
-    elif 'L40S_PCIE_48GB' in slice_type or 'L40S_48GB' in slice_type:
-        return 'L40S_48GB'
-    elif 'A100_SXM_80GB' in slice_type:
-        return 'A100_80GB_SXM'
-    elif 'A100_PCIE_80GB' in slice_type:
-        return 'A100_80GB_PCIE'
-    elif 'A100_PCIE_40GB' in slice_type:
-        return 'A100_40GB_PCIE'
-    elif 'MI300X_192GB' in slice_type:
-        return 'MI300X_192GB'
-    elif 'MI355X_288GB' in slice_type:
-        return 'MI355X_288GB'
+    # No known model matched: CPU-only if no GPU family appears at all,
+    # otherwise a GPU slice we don't recognize
+    if _GPU_PRESENT_RE.search(slice_type) is None:
+        return "CPU_ONLY"
 
     return "UNKNOWN"
 
 def calculate_node_gpus(slice_type):
     """Calculate number of GPUs based on slice type."""
     # Extract GPU count from slice type (e.g., _4_IB means 4 GPUs per slice, 2 slices = 8 GPUs)
-    gpu_count_match = re.search(r'_(\d+)_IB', slice_type)
+    gpu_count_match = _GPU_COUNT_RE.search(slice_type)
     if gpu_count_match:
         gpus_per_slice = int(gpu_count_match.group(1))
         # Most nodes have 2 slices (e.g., H100 nodes have 8 GPUs total, 4 per slice)
@@ -144,10 +287,45 @@ def calculate_node_gpus(slice_type):
     # Default to 8 GPUs for standard GPU nodes
     return 8
 
-def process_inventory():
+def _expand_stats(hierarchy):
+    """Replace each level's packed counter block with named JSON fields.
+
+    Runs once after processing; child containers are re-inserted last so the
+    serialized key order matches the established file layout.
+    """
+    def expand(entry, child_key):
+        child = entry.pop(child_key)
+        entry.update(zip(_STAT_FIELDS, entry.pop("stats")))
+        entry[child_key] = child
+        return child
+
+    for loc_data in hierarchy.values():
+        for floor_data in expand(loc_data, "floors").values():
+            for rack_data in expand(floor_data, "racks").values():
+                expand(rack_data, "ib_fabrics")
+
+def _iter_nodes():
+    """Yield nodes from INPUT_FILE one at a time.
+
+    With ijson installed the JSON array is stream-parsed, so peak memory is
+    one node plus the growing hierarchy rather than the full raw list on top
+    of it (ijson picks its fastest installed backend, e.g. yajl2_c).
+    Without it, this falls back to parsing the whole file at once.
+    """
+    if ijson is not None:
+        with open(INPUT_FILE, 'rb') as f:
+            yield from ijson.items(f, 'item')
+    else:
+        yield from _loads(INPUT_FILE.read_bytes())
+
+def process_inventory(nodes=None):
     """
     Process admin node inventory and build hierarchical structure.
 
+    Args:
+        nodes: Optional pre-parsed node list (e.g., when the caller already
+            has the raw inventory in memory). Defaults to loading INPUT_FILE.
+
     Returns:
         dict: Hierarchical datacenter inventory
     """
@@ -155,72 +333,27 @@ def process_inventory():
     print("PROCESSING ADMIN NODE INVENTORY (READ-ONLY)")
     print("="*60 + "\n")
 
-    # Load inventory
-    print(f"→ Loading inventory from {INPUT_FILE}")
-    with open(INPUT_FILE, 'r') as f:
-        nodes = json.load(f)
-
-    print(f"  Loaded {len(nodes)} nodes\n")
-
-    # Build hierarchical structure
-    hierarchy = defaultdict(lambda: {
-        "name": "",
-        "region": "",
-        "total_nodes": 0,
-        "total_gpus": 0,
-        "available_nodes": 0,
-        "available_gpus": 0,
-        "spare_nodes": 0,
-        "spare_gpus": 0,
-        "hot_spare_nodes": 0,
-        "hot_spare_gpus": 0,
-        "floors": defaultdict(lambda: {
-            "name": "",
-            "total_nodes": 0,
-            "total_gpus": 0,
-            "available_nodes": 0,
-            "available_gpus": 0,
-            "spare_nodes": 0,
-            "spare_gpus": 0,
-            "hot_spare_nodes": 0,
-            "hot_spare_gpus": 0,
-            "racks": defaultdict(lambda: {
-                "name": "",
-                "total_nodes": 0,
-                "total_gpus": 0,
-                "available_nodes": 0,
-                "available_gpus": 0,
-                "spare_nodes": 0,
-                "spare_gpus": 0,
-                "hot_spare_nodes": 0,
-                "hot_spare_gpus": 0,
-                "ib_fabrics": defaultdict(lambda: {
-                    "id": "",
-                    "nodes": []
-                })
-            })
-        })
-    })
-
-    # Track global stats
-    global_stats = {
-        "total_nodes": 0,
-        "total_gpus": 0,
-        "available_nodes": 0,
-        "available_gpus": 0,
-        "spare_nodes": 0,
-        "spare_gpus": 0,
-        "hot_spare_nodes": 0,
-        "hot_spare_gpus": 0,
-        "gpu_models": defaultdict(lambda: {"total": 0, "available": 0, "spare": 0, "hot_spare": 0}),
-        "vendors": defaultdict(lambda: {"total": 0, "available": 0, "spare": 0, "hot_spare": 0}),
-    }
+    # Load inventory (streamed node-by-node when reading from disk)
+    if nodes is None:
+        print(f"→ Loading inventory from {INPUT_FILE}")
+        nodes = _iter_nodes()
+    else:
+        print(f"  Using {len(nodes)} pre-parsed nodes\n")
+
+    # Build hierarchical structure (plain dicts from the start, so no
+    # defaultdict-unwrapping pass is needed before serialization)
+    hierarchy = {}
+
+    # Track global stats (packed, expanded to named fields below)
+    global_counters = _new_stats()
+    gpu_models = {}
+    vendors = {}
 
     print("→ Processing nodes...")
 
     for node in nodes:
         # Use location from node data (more reliable than parsing)
-        location = node.get("location", "unknown")
+        location = _intern(node.get("location", "unknown"))
 
         # Parse node name for floor and rack
         parsed = parse_node_name(node["name"])
@@ -228,7 +361,7 @@ def process_inventory():
         rack = parsed["rack"]
 
         # Get IB network
-        ib_network_id = node.get("ib_network_id", "no-ib")
+        ib_network_id = _intern(node.get("ib_network_id", "no-ib"))
 
         # Parse GPU type
         gpu_type_key = parse_gpu_type(node["type"])
@@ -257,12 +390,12 @@ def process_inventory():
         node_detail = {
             "id": node["id"],
             "name": node["name"],
-            "type": node["type"],
-            "gpu_type": gpu_info["name"],
+            "type": _intern(node["type"]),
+            "gpu_type": _intern(gpu_info["name"]),
             "gpu_count": gpu_info["gpus_per_node"],
-            "vendor": gpu_info["vendor"],
-            "state": node.get("state"),
-            "mode": node.get("mode"),
+            "vendor": _intern(gpu_info["vendor"]),
+            "state": _intern(node.get("state")),
+            "mode": _intern(node.get("mode")),
             "available_slices": int(node.get("avail", 0)),
             "used_slices": int(node.get("used", 0)) if node.get("used") else 0,
             "is_available": is_available,
@@ -275,113 +408,54 @@ def process_inventory():
         }
 
         # Update hierarchy
-        loc_data = hierarchy[location]
-        if not loc_data["name"]:
-            loc_data["name"] = LOCATION_NAMES.get(location, {}).get("name", location)
-            loc_data["region"] = LOCATION_NAMES.get(location, {}).get("region", location)
+        loc_data = hierarchy.get(location)
+        if loc_data is None:
+            loc_data = hierarchy[location] = _new_location(location)
+
+        floor_data = loc_data["floors"].get(floor)
+        if floor_data is None:
+            floor_data = loc_data["floors"][floor] = _new_floor(floor)
 
-        floor_data = loc_data["floors"][floor]
-        floor_data["name"] = floor
+        rack_data = floor_data["racks"].get(rack)
+        if rack_data is None:
+            rack_data = floor_data["racks"][rack] = _new_rack(rack)
 
-        rack_data = floor_data["racks"][rack]
-        rack_data["name"] = rack
+        ib_fabric_data = rack_data["ib_fabrics"].get(ib_network_id)
+        if ib_fabric_data is None:
+            ib_fabric_data = rack_data["ib_fabrics"][ib_network_id] = _new_ib_fabric(ib_network_id)
 
-        ib_fabric_data = rack_data["ib_fabrics"][ib_network_id]
-        ib_fabric_data["id"] = ib_network_id
         ib_fabric_data["nodes"].append(node_detail)
 
-        # Update counts
+        # Update counts: rack, floor, location, and global share a counter
+        # block, so one pass applies the node's deltas to all four levels
         gpus = gpu_info["gpus_per_node"]
+        _bump((rack_data["stats"], floor_data["stats"], loc_data["stats"], global_counters),
+              gpus, is_available, is_spare, is_hot_spare)
 
-        # Rack level
-        rack_data["total_nodes"] += 1
-        rack_data["total_gpus"] += gpus
-        if is_available:
-            rack_data["available_nodes"] += 1
-            rack_data["available_gpus"] += gpus
-        if is_spare:
-            rack_data["spare_nodes"] += 1
-            rack_data["spare_gpus"] += gpus
-        if is_hot_spare:
-            rack_data["hot_spare_nodes"] += 1
-            rack_data["hot_spare_gpus"] += gpus
-
-        # Floor level
-        floor_data["total_nodes"] += 1
-        floor_data["total_gpus"] += gpus
-        if is_available:
-            floor_data["available_nodes"] += 1
-            floor_data["available_gpus"] += gpus
-        if is_spare:
-            floor_data["spare_nodes"] += 1
-            floor_data["spare_gpus"] += gpus
-        if is_hot_spare:
-            floor_data["hot_spare_nodes"] += 1
-            floor_data["hot_spare_gpus"] += gpus
-
-        # Location level
-        loc_data["total_nodes"] += 1
-        loc_data["total_gpus"] += gpus
-        if is_available:
-            loc_data["available_nodes"] += 1
-            loc_data["available_gpus"] += gpus
-        if is_spare:
-            loc_data["spare_nodes"] += 1
-            loc_data["spare_gpus"] += gpus
-        if is_hot_spare:
-            loc_data["hot_spare_nodes"] += 1
-            loc_data["hot_spare_gpus"] += gpus
+        # GPU model / vendor stats track GPU counts only
+        model_stats = gpu_models.setdefault(
+            gpu_info["name"], {"total": 0, "available": 0, "spare": 0, "hot_spare": 0})
+        _bump_gpu_totals(model_stats, gpus, is_available, is_spare, is_hot_spare)
 
-        # Global level
-        global_stats["total_nodes"] += 1
-        global_stats["total_gpus"] += gpus
-        if is_available:
-            global_stats["available_nodes"] += 1
-            global_stats["available_gpus"] += gpus
-        if is_spare:
-            global_stats["spare_nodes"] += 1
-            global_stats["spare_gpus"] += gpus
-        if is_hot_spare:
-            global_stats["hot_spare_nodes"] += 1
-            global_stats["hot_spare_gpus"] += gpus
+        vendor_stats = vendors.setdefault(
+            gpu_info["vendor"], {"total": 0, "available": 0, "spare": 0, "hot_spare": 0})
+        _bump_gpu_totals(vendor_stats, gpus, is_available, is_spare, is_hot_spare)
 
-        # GPU model stats
-        global_stats["gpu_models"][gpu_info["name"]]["total"] += gpus
-        if is_available:
-            global_stats["gpu_models"][gpu_info["name"]]["available"] += gpus
-        if is_spare:
-            global_stats["gpu_models"][gpu_info["name"]]["spare"] += gpus
-        if is_hot_spare:
-            global_stats["gpu_models"][gpu_info["name"]]["hot_spare"] += gpus
+    print(f"✓ Processed {global_counters[_TN]} nodes with {global_counters[_TG]} GPUs")
+    print(f"  Available: {global_counters[_AN]} nodes, {global_counters[_AG]} GPUs")
+    print(f"  Spare (Unreserved): {global_counters[_SN]} nodes, {global_counters[_SG]} GPUs")
+    print(f"  Hot Spare: {global_counters[_HN]} nodes, {global_counters[_HG]} GPUs\n")
 
-        # Vendor stats
-        global_stats["vendors"][gpu_info["vendor"]]["total"] += gpus
-        if is_available:
-            global_stats["vendors"][gpu_info["vendor"]]["available"] += gpus
-        if is_spare:
-            global_stats["vendors"][gpu_info["vendor"]]["spare"] += gpus
-        if is_hot_spare:
-            global_stats["vendors"][gpu_info["vendor"]]["hot_spare"] += gpus
-
-    print(f"✓ Processed {global_stats['total_nodes']} nodes with {global_stats['total_gpus']} GPUs")
-    print(f"  Available: {global_stats['available_nodes']} nodes, {global_stats['available_gpus']} GPUs")
-    print(f"  Spare (Unreserved): {global_stats['spare_nodes']} nodes, {global_stats['spare_gpus']} GPUs")
-    print(f"  Hot Spare: {global_stats['hot_spare_nodes']} nodes, {global_stats['hot_spare_gpus']} GPUs\n")
-
-    # Convert defaultdicts to regular dicts for JSON serialization
-    def convert_to_dict(obj):
-        if isinstance(obj, defaultdict):
-            obj = {k: convert_to_dict(v) for k, v in obj.items()}
-        elif isinstance(obj, dict):
-            obj = {k: convert_to_dict(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            obj = [convert_to_dict(item) for item in obj]
-        return obj
+    # Expand the packed counters into the named fields the consumers expect
+    _expand_stats(hierarchy)
+    global_stats = dict(zip(_STAT_FIELDS, global_counters))
+    global_stats["gpu_models"] = gpu_models
+    global_stats["vendors"] = vendors
 
     inventory = {
-        "last_updated": datetime.utcnow().isoformat() + "Z",
-        "global_stats": convert_to_dict(global_stats),
-        "locations": convert_to_dict(hierarchy)
+        "last_updated": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "global_stats": global_stats,
+        "locations": hierarchy
     }
 
     return inventory
@@ -390,8 +464,7 @@ def save_inventory(inventory):
     """Save processed inventory to JSON file."""
     print(f"→ Saving inventory to {OUTPUT_FILE}")
 
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(inventory, f, indent=2)
+    OUTPUT_FILE.write_bytes(_dumps(inventory))
 
     print(f"✓ Inventory saved\n")
 
@@ -421,10 +494,10 @@ def print_summary(inventory):
         print(f"  {location_data['name']}: {location_data['total_nodes']:,} nodes, {location_data['total_gpus']:,} GPUs ({location_data['available_gpus']:,} available)")
         print(f"    Floors: {len(location_data['floors'])}")
 
-def main():
+def main(nodes=None):
     """Main execution function."""
     try:
-        inventory = process_inventory()
+        inventory = process_inventory(nodes)
         save_inventory(inventory)
         print_summary(inventory)
         print("\n✓ Processing completed successfully\n")
@@ -8,18 +8,76 @@ the hierarchical datacenter inventory.
 IMPORTANT: This script only performs READ operations.
 """
 
+import functools
 import json
+import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to stdlib
+    _loads = json.loads
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
 INVENTORY_FILE = DATA_DIR / "datacenter_inventory.json"
 
+# A matched node plus its position in the hierarchy. The node dict itself is
+# shared with the cached inventory and must not be mutated
+NodeHit = namedtuple('NodeHit', 'node location floor rack')
+
+@functools.lru_cache(maxsize=1)
 def load_inventory():
-    """Load the datacenter inventory."""
-    with open(INVENTORY_FILE, 'r') as f:
-        return json.load(f)
+    """Load the datacenter inventory (parsed once per process)."""
+    return _loads(INVENTORY_FILE.read_bytes())
+
+@functools.lru_cache(maxsize=1)
+def _available_node_indexes():
+    """Walk the hierarchy once and index available nodes by common filters.
+
+    Each entry is (node, loc_key, loc_name, floor_key, rack_key) so queries
+    can iterate just the matching bucket instead of re-walking the whole
+    five-level hierarchy.
+    """
+    indexes = {
+        "all": [],
+        "by_gpu_type": defaultdict(list),
+        "by_location": defaultdict(list),
+        "by_ib_fabric": defaultdict(list),
+    }
+
+    inventory = load_inventory()
+    for loc_key, loc_data in inventory["locations"].items():
+        # The processor precomputes available_nodes at every level, so whole
+        # subtrees with nothing available are skipped without descending
+        if loc_data["available_nodes"] == 0:
+            continue
+        loc_name = loc_data["name"]
+        # A location missing from LOCATION_NAMES defaults its name to the
+        # code; the set collapses the aliases so such entries aren't
+        # indexed (and then returned) twice under the same key
+        loc_aliases = {loc_key.lower(), loc_name.lower()}
+        for floor_key, floor_data in loc_data["floors"].items():
+            if floor_data["available_nodes"] == 0:
+                continue
+            for rack_key, rack_data in floor_data["racks"].items():
+                if rack_data["available_nodes"] == 0:
+                    continue
+                for ib_key, ib_data in rack_data["ib_fabrics"].items():
+                    for node in ib_data["nodes"]:
+                        if not node["is_available"]:
+                            continue
+                        entry = (node, loc_key, loc_name, floor_key, rack_key)
+                        indexes["all"].append(entry)
+                        indexes["by_gpu_type"][node["gpu_type"].lower()].append(entry)
+                        # Locations are addressable by code or friendly name
+                        for alias in loc_aliases:
+                            indexes["by_location"][alias].append(entry)
+                        indexes["by_ib_fabric"][ib_key].append(entry)
+
+    return indexes
 
 def find_available_capacity(
     gpu_type=None,
@@ -39,61 +97,88 @@ def find_available_capacity(
         ib_fabric (str): IB fabric ID to filter by
 
     Returns:
-        list: List of available nodes matching the criteria
+        list: NodeHit tuples for available nodes matching the criteria
     """
-    inventory = load_inventory()
+    indexes = _available_node_indexes()
+
+    # Start from the most selective applicable index so the scan below only
+    # touches candidate nodes instead of the whole fleet
+    if gpu_type:
+        entries = indexes["by_gpu_type"].get(gpu_type.lower(), [])
+    elif ib_fabric:
+        entries = indexes["by_ib_fabric"].get(ib_fabric, [])
+    elif location:
+        entries = indexes["by_location"].get(location.lower(), [])
+    else:
+        entries = indexes["all"]
+
     available_nodes = []
 
-    for loc_key, loc_data in inventory["locations"].items():
+    for node, loc_key, loc_name, floor_key, rack_key in entries:
         # Filter by location
-        if location and location.lower() not in [loc_key.lower(), loc_data["name"].lower()]:
+        if location and location.lower() not in (loc_key.lower(), loc_name.lower()):
             continue
 
-        for floor_key, floor_data in loc_data["floors"].items():
-            # Filter by floor
-            if floor and floor.lower() != floor_key.lower():
-                continue
+        # Filter by floor
+        if floor and floor.lower() != floor_key.lower():
+            continue
 
-            for rack_key, rack_data in floor_data["racks"].items():
-                for ib_key, ib_data in rack_data["ib_fabrics"].items():
-                    # Filter by IB fabric
-                    if ib_fabric and ib_fabric != ib_key:
-                        continue
+        # Filter by IB fabric
+        if ib_fabric and ib_fabric != node["ib_network_id"]:
+            continue
 
-                    for node in ib_data["nodes"]:
-                        # Only include available nodes
-                        if not node["is_available"]:
-                            continue
+        # Filter by GPU type
+        if gpu_type and gpu_type.lower() != node["gpu_type"].lower():
+            continue
 
-                        # Filter by GPU type
-                        if gpu_type and gpu_type.lower() != node["gpu_type"].lower():
-                            continue
+        # Filter by minimum GPUs
+        if min_gpus and node["gpu_count"] < min_gpus:
+            continue
 
-                        # Filter by minimum GPUs
-                        if min_gpus and node["gpu_count"] < min_gpus:
-                            continue
+        # Wrap rather than copy or mutate: the node dict stays shared with
+        # the cached inventory, and the hit carries its own hierarchy context
+        available_nodes.append(NodeHit(node, loc_name, floor_key, rack_key))
 
-                        # Add location context
-                        node["_location"] = loc_data["name"]
-                        node["_floor"] = floor_key
-                        node["_rack"] = rack_key
+    return available_nodes
 
-                        available_nodes.append(node)
+def run_batched_queries(queries):
+    """Evaluate several capacity queries in one pass over available nodes.
 
-    return available_nodes
+    Each node is pushed through every predicate during a single scan, so N
+    queries cost one traversal instead of N.
+
+    Args:
+        queries: list of (label, predicate) pairs where
+            predicate(node, location_name) returns True on a match
+
+    Returns:
+        dict: label -> list of NodeHit
+    """
+    results = {label: [] for label, _ in queries}
+
+    for node, loc_key, loc_name, floor_key, rack_key in _available_node_indexes()["all"]:
+        hit = None
+        for label, predicate in queries:
+            if predicate(node, loc_name):
+                if hit is None:
+                    hit = NodeHit(node, loc_name, floor_key, rack_key)
+                results[label].append(hit)
+
+    return results
 
-def summarize_capacity(nodes):
+def summarize_capacity(hits):
     """Summarize capacity by location, GPU type, and IB fabric."""
     summary = {
-        "total_nodes": len(nodes),
-        "total_gpus": sum(n["gpu_count"] for n in nodes),
+        "total_nodes": len(hits),
+        "total_gpus": sum(hit.node["gpu_count"] for hit in hits),
         "by_location": defaultdict(lambda: {"nodes": 0, "gpus": 0}),
         "by_gpu_type": defaultdict(lambda: {"nodes": 0, "gpus": 0}),
         "by_ib_fabric": defaultdict(lambda: {"nodes": 0, "gpus": 0, "location": "", "floor": ""}),
     }
 
-    for node in nodes:
-        location = node["_location"]
+    for hit in hits:
+        node = hit.node
+        location = hit.location
         gpu_type = node["gpu_type"]
         ib_fabric = node["ib_network_id"]
         gpus = node["gpu_count"]
@@ -107,27 +192,39 @@ def summarize_capacity(nodes):
         summary["by_ib_fabric"][ib_fabric]["nodes"] += 1
         summary["by_ib_fabric"][ib_fabric]["gpus"] += gpus
         summary["by_ib_fabric"][ib_fabric]["location"] = location
-        summary["by_ib_fabric"][ib_fabric]["floor"] = node["_floor"]
+        summary["by_ib_fabric"][ib_fabric]["floor"] = hit.floor
 
     return summary
 
-def print_capacity_summary(summary):
-    """Print capacity summary in a readable format."""
-    print(f"\n{'='*60}")
-    print(f"AVAILABLE CAPACITY SUMMARY")
-    print(f"{'='*60}")
+def _emit(lines, buffered):
+    """Write accumulated lines in one call when not buffering for a caller."""
+    if not buffered:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+def print_capacity_summary(summary, lines=None):
+    """Print capacity summary in a readable format.
+
+    Output is accumulated and written once; pass a `lines` list to buffer
+    into a larger report instead of writing immediately.
+    """
+    buffered = lines is not None
+    out = lines if buffered else []
 
-    print(f"\nTotal: {summary['total_nodes']} nodes, {summary['total_gpus']} GPUs")
+    out.append(f"\n{'='*60}")
+    out.append(f"AVAILABLE CAPACITY SUMMARY")
+    out.append(f"{'='*60}")
 
-    print(f"\nBy Location:")
+    out.append(f"\nTotal: {summary['total_nodes']} nodes, {summary['total_gpus']} GPUs")
+
+    out.append(f"\nBy Location:")
     for location, data in sorted(summary["by_location"].items()):
-        print(f"  {location}: {data['nodes']} nodes, {data['gpus']} GPUs")
+        out.append(f"  {location}: {data['nodes']} nodes, {data['gpus']} GPUs")
 
-    print(f"\nBy GPU Type:")
+    out.append(f"\nBy GPU Type:")
     for gpu_type, data in sorted(summary["by_gpu_type"].items()):
-        print(f"  {gpu_type}: {data['nodes']} nodes, {data['gpus']} GPUs")
+        out.append(f"  {gpu_type}: {data['nodes']} nodes, {data['gpus']} GPUs")
 
-    print(f"\nBy IB Fabric (Top 10):")
+    out.append(f"\nBy IB Fabric (Top 10):")
     fabrics = sorted(
         summary["by_ib_fabric"].items(),
         key=lambda x: x[1]["gpus"],
@@ -136,70 +233,74 @@ def print_capacity_summary(summary):
 
     for fabric_id, data in fabrics:
         fabric_short = fabric_id[:16] + "..." if len(fabric_id) > 16 else fabric_id
-        print(f"  {fabric_short}")
-        print(f"    Location: {data['location']}, Floor: {data['floor']}")
-        print(f"    Nodes: {data['nodes']}, GPUs: {data['gpus']}")
-
-def print_node_list(nodes, limit=20):
-    """Print list of available nodes."""
-    print(f"\n{'='*60}")
-    print(f"AVAILABLE NODES (showing {min(limit, len(nodes))} of {len(nodes)})")
-    print(f"{'='*60}\n")
-
-    for i, node in enumerate(nodes[:limit]):
-        print(f"{i+1}. {node['name']}")
-        print(f"   Location: {node['_location']}, Floor: {node['_floor']}, Rack: {node['_rack']}")
-        print(f"   GPU: {node['gpu_type']} x{node['gpu_count']}")
-        print(f"   State: {node['state']}, Mode: {node['mode']}")
-        print(f"   Available Slices: {node['available_slices']}")
-        print()
+        out.append(f"  {fabric_short}")
+        out.append(f"    Location: {data['location']}, Floor: {data['floor']}")
+        out.append(f"    Nodes: {data['nodes']}, GPUs: {data['gpus']}")
+
+    _emit(out, buffered)
+
+def print_node_list(hits, limit=20, lines=None):
+    """Print list of available nodes (buffered; see print_capacity_summary)."""
+    buffered = lines is not None
+    out = lines if buffered else []
+
+    out.append(f"\n{'='*60}")
+    out.append(f"AVAILABLE NODES (showing {min(limit, len(hits))} of {len(hits)})")
+    out.append(f"{'='*60}\n")
+
+    for i, hit in enumerate(hits[:limit]):
+        node = hit.node
+        out.append(f"{i+1}. {node['name']}")
+        out.append(f"   Location: {hit.location}, Floor: {hit.floor}, Rack: {hit.rack}")
+        out.append(f"   GPU: {node['gpu_type']} x{node['gpu_count']}")
+        out.append(f"   State: {node['state']}, Mode: {node['mode']}")
+        out.append(f"   Available Slices: {node['available_slices']}")
+        out.append("")
+
+    _emit(out, buffered)
 
 def main():
     """Main execution with example queries."""
-    print("\n" + "="*60)
-    print("CRUSOE CLOUD CAPACITY QUERY TOOL")
-    print("="*60)
-
-    # Example 1: Find all available H100 nodes
-    print("\n[Query 1] All available H100-SXM-80GB nodes:")
-    nodes = find_available_capacity(gpu_type="H100-SXM-80GB")
-    summary = summarize_capacity(nodes)
-    print_capacity_summary(summary)
-
-    # Example 2: Find available H200 nodes in Iceland
-    print("\n" + "="*60)
-    print("\n[Query 2] Available H200 nodes in Iceland:")
-    nodes = find_available_capacity(gpu_type="H200-SXM-141GB", location="Iceland")
-    summary = summarize_capacity(nodes)
-    print_capacity_summary(summary)
-    print_node_list(nodes, limit=10)
-
-    # Example 3: Find any available nodes with at least 8 GPUs
-    print("\n" + "="*60)
-    print("\n[Query 3] Available nodes with 8+ GPUs (any type):")
-    nodes = find_available_capacity(min_gpus=8)
-    summary = summarize_capacity(nodes)
-    print_capacity_summary(summary)
-
-    # Example 4: Find available L40S nodes (good for inference)
-    print("\n" + "="*60)
-    print("\n[Query 4] Available L40S-48GB nodes:")
-    nodes = find_available_capacity(gpu_type="L40S-48GB")
-    summary = summarize_capacity(nodes)
-    print_capacity_summary(summary)
-    print_node_list(nodes, limit=10)
-
-    # Example 5: Find available GB200 superchips
-    print("\n" + "="*60)
-    print("\n[Query 5] Available GB200-NVL-186GB nodes:")
-    nodes = find_available_capacity(gpu_type="GB200-NVL-186GB")
-    summary = summarize_capacity(nodes)
-    print_capacity_summary(summary)
-    print_node_list(nodes, limit=10)
-
-    print("\n" + "="*60)
-    print("Query examples completed!")
-    print("="*60 + "\n")
+    # The whole report is accumulated and written with a single stdout call
+    lines = []
+    lines.append("\n" + "="*60)
+    lines.append("CRUSOE CLOUD CAPACITY QUERY TOOL")
+    lines.append("="*60)
+
+    # All example cuts are evaluated in one pass over the available nodes;
+    # node_limit > 0 additionally prints that many matching nodes
+    examples = [
+        ("[Query 1] All available H100-SXM-80GB nodes:",
+         lambda n, loc: n["gpu_type"] == "H100-SXM-80GB", 0),
+        ("[Query 2] Available H200 nodes in Iceland:",
+         lambda n, loc: n["gpu_type"] == "H200-SXM-141GB" and loc == "Iceland", 10),
+        ("[Query 3] Available nodes with 8+ GPUs (any type):",
+         lambda n, loc: n["gpu_count"] >= 8, 0),
+        ("[Query 4] Available L40S-48GB nodes:",
+         lambda n, loc: n["gpu_type"] == "L40S-48GB", 10),
+        ("[Query 5] Available GB200-NVL-186GB nodes:",
+         lambda n, loc: n["gpu_type"] == "GB200-NVL-186GB", 10),
+    ]
+
+    results = run_batched_queries([(label, pred) for label, pred, _ in examples])
+
+    first = True
+    for label, _, node_limit in examples:
+        if not first:
+            lines.append("\n" + "="*60)
+        first = False
+
+        lines.append(f"\n{label}")
+        hits = results[label]
+        print_capacity_summary(summarize_capacity(hits), lines=lines)
+        if node_limit:
+            print_node_list(hits, limit=node_limit, lines=lines)
+
+    lines.append("\n" + "="*60)
+    lines.append("Query examples completed!")
+    lines.append("="*60 + "\n")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
@@ -5,18 +5,42 @@ Crusoe Cloud GPU Infrastructure Metrics Updater
 This script fetches GPU infrastructure metrics from Crusoe Cloud using the CLI
 and updates the metrics.json file used by the dashboard.
 
+The module is pure Python (orjson, the only optional C extension, ships
+PyPy wheels), so standalone cron runs can use pypy3 for its dict/string-
+heavy aggregation if desired; the shebang stays python3 because the
+backend app also imports this module in-process.
+
 IMPORTANT: This script only performs READ operations via the Crusoe CLI.
 """
 
+import functools
 import json
+import os
 import subprocess
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:  # orjson is optional; fall back to stdlib
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode()
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
 METRICS_FILE = DATA_DIR / "metrics.json"
+CACHE_DIR = DATA_DIR / ".cache"
+
+# VM types and locations change on the scale of weeks; cache them on disk
+# so cron re-runs skip those CLI round-trips
+CACHE_TTL_SECONDS = 24 * 3600
 
 # GPU pricing estimates (monthly per GPU in USD)
 GPU_PRICING = {
@@ -39,17 +63,47 @@ def run_crusoe_command(args):
     Returns:
         dict: Parsed JSON response
     """
-    try:
-        cmd = ["crusoe"] + args + ["--json"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command {' '.join(cmd)}: {e.stderr}")
+    cmd = ["crusoe"] + args + ["--json"]
+    # Read the pipe as raw bytes and hand them straight to the parser: no
+    # text-mode decode pass and no CalledProcessError machinery in between
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+
+    if proc.returncode != 0:
+        stderr = err.decode(errors="replace") if err else ""
+        print(f"Error running command {' '.join(cmd)}: {stderr}")
         return None
-    except json.JSONDecodeError as e:
+
+    try:
+        return _loads(out)
+    except ValueError as e:  # covers both orjson and stdlib decode errors
         print(f"Error parsing JSON from command output: {e}")
         return None
 
+def _cached_call(name, fetcher, ttl_seconds=CACHE_TTL_SECONDS):
+    """
+    Return fetcher()'s result, cached on disk for ttl_seconds
+
+    Args:
+        name (str): Cache file name under CACHE_DIR
+        fetcher (callable): Called on a cache miss; None results aren't cached
+
+    Returns:
+        Cached or freshly fetched value
+    """
+    path = CACHE_DIR / name
+    try:
+        if time.time() - path.stat().st_mtime < ttl_seconds:
+            return _loads(path.read_bytes())
+    except (OSError, ValueError):
+        pass  # missing or unreadable cache entry; fall through to fetch
+
+    result = fetcher()
+    if result is not None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_dumps(result))
+    return result
+
 def fetch_all_projects():
     """Fetch all projects (READ-only)"""
     print("→ Fetching projects...")
@@ -59,19 +113,34 @@ def fetch_all_projects():
     return projects or []
 
 def fetch_vm_types():
-    """Fetch available VM types (READ-only)"""
+    """Fetch available VM types (READ-only, cached for a day)"""
     print("→ Fetching VM types...")
-    return run_crusoe_command(["compute", "vms", "types"])
+    return _cached_call(
+        "vm_types.json",
+        lambda: run_crusoe_command(["compute", "vms", "types"]))
 
 def fetch_locations():
-    """Fetch available locations (READ-only)"""
+    """Fetch available locations (READ-only, cached for a day)"""
     print("→ Fetching locations...")
-    return run_crusoe_command(["locations", "list"])
+    return _cached_call(
+        "locations.json",
+        lambda: run_crusoe_command(["locations", "list"]))
 
 def fetch_instances_for_project(project_id):
     """Fetch all instances for a project (READ-only)"""
     return run_crusoe_command(["compute", "vms", "list", "--project-id", project_id])
 
+@functools.lru_cache(maxsize=1)
+def _supports_all_projects():
+    """Check once whether the CLI's vms list accepts --all-projects"""
+    try:
+        result = subprocess.run(
+            ["crusoe", "compute", "vms", "list", "--help"],
+            capture_output=True)
+    except OSError:
+        return False
+    return b"--all-projects" in (result.stdout or b"")
+
 def fetch_crusoe_metrics():
     """
     Fetch current infrastructure metrics from Crusoe Cloud CLI (READ-only)
@@ -83,62 +152,113 @@ def fetch_crusoe_metrics():
     print("FETCHING CRUSOE CLOUD INFRASTRUCTURE METRICS (READ-ONLY)")
     print("="*60 + "\n")
 
-    # Fetch available VM types for GPU info
-    vm_types = fetch_vm_types()
-
-    # Fetch all projects
-    projects = fetch_all_projects()
-
-    # Fetch locations
-    locations = fetch_locations() or []
-
-    # Aggregate metrics
-    gpu_counts = defaultdict(int)
-    location_counts = defaultdict(lambda: {"nodes": 0, "gpus": 0})
-    state_counts = defaultdict(int)
-    total_nodes = 0
-    total_gpus = 0
-
-    print("\n→ Fetching instances across all projects...")
-
-    # Query instances from each project
-    for project in projects:
-        project_id = project.get("id")
-        project_name = project.get("name")
-
-        instances = fetch_instances_for_project(project_id)
-        if not instances:
-            continue
+    # Every CLI call is an independent READ, so the cost is I/O wait: fan
+    # them out on threads and keep the aggregation single-threaded below
+    with ThreadPoolExecutor(max_workers=16, thread_name_prefix='cli') as pool:
+        # VM types, projects, and locations have no ordering dependency
+        vm_types_future = pool.submit(fetch_vm_types)
+        projects_future = pool.submit(fetch_all_projects)
+        locations_future = pool.submit(fetch_locations)
+
+        vm_types = vm_types_future.result()
+        projects = projects_future.result()
+        locations = locations_future.result() or []
+
+        print("\n→ Fetching instances across all projects...")
+
+        project_instances = []
+
+        if _supports_all_projects():
+            # One batched CLI call replaces a subprocess per project
+            by_project = defaultdict(list)
+            for instance in run_crusoe_command(
+                    ["compute", "vms", "list", "--all-projects"]) or []:
+                by_project[instance.get("project_id")].append(instance)
+
+            project_names = {p.get("id"): p.get("name") for p in projects}
+            for project_id, instances in by_project.items():
+                print(f"  {project_names.get(project_id, project_id)}: "
+                      f"{len(instances)} instances")
+                project_instances.append(instances)
+        else:
+            # Fall back to querying each project concurrently
+            futures = {
+                pool.submit(fetch_instances_for_project, project.get("id")): project
+                for project in projects
+            }
+            for future in as_completed(futures):
+                project = futures[future]
+                instances = future.result()
+                if not instances:
+                    continue
+                print(f"  {project.get('name')}: {len(instances)} instances")
+                project_instances.append(instances)
+
+    # Hash the VM-type catalogue once; the instance loop then resolves GPU
+    # info with a single dict lookup instead of a linear scan per instance
+    vm_index = {
+        vt["product_name"]: (vt.get("gpu_type", ""), vt.get("num_gpu", 0))
+        for vt in (vm_types or [])
+    }
 
-        print(f"  {project_name}: {len(instances)} instances")
+    # Vendor per GPU model, resolved once per catalogue entry so the vendor
+    # split is tallied in the main loop rather than re-scanned afterwards
+    vendor_index = {
+        gpu_type: "amd" if "MI300X" in gpu_type else "nvidia"
+        for gpu_type, _ in vm_index.values() if gpu_type
+    }
 
+    # Aggregate metrics. Counters tally in C, so each project's batch is
+    # pushed through Counter.update instead of per-instance dict increments
+    gpu_counts = Counter()
+    state_counts = Counter()
+    location_nodes = Counter()
+    location_gpus = Counter()
+    vendor_counts = Counter()
+
+    # Local binds keep the per-instance bytecode to plain fast-local loads
+    # instead of repeated attribute lookups
+    vm_index_get = vm_index.get
+    no_gpu = ("", 0)
+
+    for instances in project_instances:
+        # (gpu_type, location, state, num_gpus) for GPU-bearing instances
+        batch = []
+        append = batch.append
         for instance in instances:
-            vm_type = instance.get("type", "")
-            location = instance.get("location", "unknown")
-            state = instance.get("state", "unknown")
-
-            # Find GPU info from VM types
-            gpu_type = None
-            num_gpus = 0
-
-            if vm_types:
-                for vt in vm_types:
-                    if vt.get("product_name") == vm_type:
-                        gpu_type = vt.get("gpu_type", "")
-                        num_gpus = vt.get("num_gpu", 0)
-                        break
-
+            get = instance.get
+            gpu_type, num_gpus = vm_index_get(get("type", ""), no_gpu)
             if gpu_type and num_gpus > 0:
-                gpu_counts[gpu_type] += num_gpus
-                location_counts[location]["nodes"] += 1
-                location_counts[location]["gpus"] += num_gpus
-                total_nodes += 1
-                total_gpus += num_gpus
-                state_counts[state] += 1
+                append((gpu_type, get("location", "unknown"),
+                        get("state", "unknown"), num_gpus))
+        if not batch:
+            continue
 
-    # Calculate vendor split
-    nvidia_gpus = sum(count for gpu, count in gpu_counts.items() if "MI300X" not in gpu)
-    amd_gpus = gpu_counts.get("MI300X", 0)
+        state_counts.update(state for _, _, state, _ in batch)
+        location_nodes.update(location for _, location, _, _ in batch)
+
+        # Weighted tallies: collapse the batch per key, then merge once
+        batch_gpus = defaultdict(int)
+        batch_location_gpus = defaultdict(int)
+        for gpu_type, location, _, num_gpus in batch:
+            batch_gpus[gpu_type] += num_gpus
+            batch_location_gpus[location] += num_gpus
+        gpu_counts.update(batch_gpus)
+        location_gpus.update(batch_location_gpus)
+        for gpu_type, count in batch_gpus.items():
+            vendor_counts[vendor_index.get(gpu_type, "nvidia")] += count
+
+    total_nodes = sum(state_counts.values())
+    total_gpus = sum(gpu_counts.values())
+
+    location_counts = {
+        location: {"nodes": location_nodes[location], "gpus": location_gpus[location]}
+        for location in location_nodes
+    }
+
+    # Vendor split was tallied alongside the GPU counts
+    nvidia_gpus = vendor_counts["nvidia"]
+    amd_gpus = vendor_counts["amd"]
 
     # Calculate estimated revenue
     monthly_revenue = sum(
@@ -154,9 +274,13 @@ def fetch_crusoe_metrics():
         "us-west1-a": "us-west"
     }
 
+    # Percentages are derived inline while the totals are at hand, so no
+    # second pass over the metrics is needed before saving
+    pct_scale = 100.0 / total_gpus if total_gpus else 0.0
+
     # Build metrics structure
     metrics = {
-        "last_updated": datetime.utcnow().isoformat() + "Z",
+        "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
         "global_summary": {
             "total_nodes": total_nodes,
             "total_gpus": total_gpus,
@@ -164,13 +288,16 @@ def fetch_crusoe_metrics():
             "available_nodes": state_counts.get("STATE_RUNNING", 0)
         },
         "vendors": {
-            "nvidia": {"gpus": nvidia_gpus, "percentage": 0},
-            "amd": {"gpus": amd_gpus, "percentage": 0}
+            "nvidia": {"gpus": nvidia_gpus,
+                       "percentage": round(nvidia_gpus * pct_scale, 1)},
+            "amd": {"gpus": amd_gpus,
+                    "percentage": round(amd_gpus * pct_scale, 1)}
         },
         "regions": {},
         "gpu_models": {},
-        "states": dict(state_counts),
-        "raw_location_data": dict(location_counts)
+        # Counters and plain dicts serialize identically; no copies needed
+        "states": state_counts,
+        "raw_location_data": location_counts
     }
 
     # Add region details
@@ -187,7 +314,7 @@ def fetch_crusoe_metrics():
     for gpu_type, count in gpu_counts.items():
         metrics["gpu_models"][gpu_type] = {
             "gpus": count,
-            "percentage": 0  # Will be calculated later
+            "percentage": round(count * pct_scale)
         }
 
     print(f"\n✓ Aggregated {total_nodes} nodes with {total_gpus} GPUs")
@@ -197,31 +324,6 @@ def fetch_crusoe_metrics():
 
     return metrics
 
-def calculate_derived_metrics(metrics):
-    """
-    Calculate derived metrics like percentages, revenue, etc.
-    
-    Args:
-        metrics (dict): Raw metrics data
-        
-    Returns:
-        dict: Metrics with derived values added
-    """
-    # Calculate vendor percentages
-    total_gpus = metrics["global_summary"]["total_gpus"]
-    if total_gpus > 0:
-        nvidia_gpus = metrics["vendors"]["nvidia"]["gpus"]
-        amd_gpus = metrics["vendors"]["amd"]["gpus"]
-        metrics["vendors"]["nvidia"]["percentage"] = round((nvidia_gpus / total_gpus) * 100, 1)
-        metrics["vendors"]["amd"]["percentage"] = round((amd_gpus / total_gpus) * 100, 1)
-    
-    # Calculate GPU model percentages
-    for model in metrics.get("gpu_models", {}).values():
-        if total_gpus > 0:
-            model["percentage"] = round((model["gpus"] / total_gpus) * 100)
-    
-    return metrics
-
 def save_metrics(metrics):
     """
     Save metrics to JSON file
@@ -230,24 +332,24 @@ def save_metrics(metrics):
         metrics (dict): Metrics data to save
     """
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
-    with open(METRICS_FILE, 'w') as f:
-        json.dump(metrics, f, indent=2)
-    
+
+    # Write to a sibling tempfile and rename so the dashboard never reads a
+    # partially written metrics.json if the run is interrupted
+    tmp_file = METRICS_FILE.with_suffix(".json.tmp")
+    tmp_file.write_bytes(_dumps(metrics))
+    os.replace(tmp_file, METRICS_FILE)
+
     print(f"Metrics saved to {METRICS_FILE}")
 
 def main():
     """Main execution function"""
     try:
-        # Fetch metrics from API
-        raw_metrics = fetch_crusoe_metrics()
-        
-        # Calculate derived metrics
-        processed_metrics = calculate_derived_metrics(raw_metrics)
-        
+        # Fetch metrics (percentages are derived inline during the fetch)
+        metrics = fetch_crusoe_metrics()
+
         # Save to file
-        save_metrics(processed_metrics)
-        
+        save_metrics(metrics)
+
         print("✓ Metrics update completed successfully")
         
     except Exception as e: